@@ -24,6 +24,37 @@ def execute_neo4j_query(driver, query, parameters=None):
         st.exception(e)
         return []
 
+QUESTION_NEIGHBORHOOD_QUERY = """
+MATCH (q:Question)
+WHERE q.uuid IN $uuids
+CALL {
+    WITH q
+    MATCH (u:User)-[r:ASKED]->(q)
+    RETURN u AS n, r
+    UNION
+    WITH q
+    MATCH (q)-[r:TAGGED]->(t:Tag)
+    RETURN t AS n, r
+    UNION
+    WITH q
+    MATCH (a:Answer)-[r:ANSWERED]->(q)
+    WITH a, r ORDER BY a.is_accepted DESC, a.score DESC LIMIT $answer_limit
+    RETURN a AS n, r
+}
+RETURN q, r, n
+"""
+
+def fetch_question_neighborhood(driver, question_uuids, answer_limit=3):
+    """Fetch questions by uuid with their asker, tags and top answers.
+    Used to expand vector-search hits into a graph without going through the
+    LLM; the uuids are passed as a parameter so the query plan is cached.
+    """
+    return execute_neo4j_query(
+        driver,
+        QUESTION_NEIGHBORHOOD_QUERY,
+        {"uuids": list(question_uuids), "answer_limit": answer_limit},
+    )
+
 def convert_neo4j_to_graph(records):
     """Convert Neo4j query results to Streamlit-agraph nodes and edges.
     Any relationships returned by the query are used directly. When a record
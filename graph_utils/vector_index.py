@@ -0,0 +1,338 @@
+"""Local embedding index over Question titles (and optionally Answer snippets).
+
+Vectors live in a raw float32 file that is memory-mapped for search, so the
+index can grow past RAM and be appended to by the nightly load without a
+rebuild. Every entry maps back to a Question uuid, which is what
+`graph_utils.fetch_question_neighborhood` expects.
+
+    python vector_index.py --path vector_index            # sync titles
+    python vector_index.py --path vector_index --answers  # + answer snippets
+"""
+import argparse
+import json
+import os
+import re
+import zlib
+
+import numpy as np
+
+VECTORS_FILE = "vectors.f32"
+ENTRIES_FILE = "entries.json"
+META_FILE = "meta.json"
+
+
+# Words that carry no topic; left in, they dominate short titles and questions.
+STOPWORDS = frozenset("""
+a about an and any are as at be been but by can could do does did for from get got had
+has have how i if in into is it its just me my no not of on or our should so some than
+that the their them then there these they this to too up us use using vs was we what
+whats when where which while who why will with would you your
+""".split())
+
+
+def _stem(word):
+    """Strip a common English suffix so "traversals" and "traversal" match."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+class HashingEmbedder:
+    """Offline default: hashed word and character-trigram features.
+
+    Deterministic across processes (crc32, not the salted built-in hash) and
+    needs no model download or network. Stopwords are dropped and words are
+    stemmed before hashing; each word's trigrams share one unit of weight so
+    long words do not drown out short ones.
+    """
+
+    name = "hashing"
+    # Bump whenever the features change; vectors from another version are not comparable.
+    version = 2
+    # Cosine scores below `min_score` are noise; above `confident_score` a
+    # match is trusted without asking the LLM. Tuned on sample StackOverflow titles.
+    min_score = 0.2
+    confident_score = 0.35
+
+    def __init__(self, dim=1024):
+        self.dim = dim
+
+    def _features(self, text):
+        words = [_stem(w) for w in re.findall(r"\w+", text.lower()) if w not in STOPWORDS]
+        features = [(word, 1.0) for word in words]
+        for word in words:
+            padded = f"#{word}#"
+            trigrams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+            weight = 1.0 / len(trigrams) ** 0.5
+            features.extend((trigram, weight) for trigram in trigrams)
+        return features
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text or ""):
+                h = zlib.crc32(feature.encode("utf-8"))
+                matrix[row, h % self.dim] += weight if h & 0x80000000 else -weight
+        return _normalize(matrix)
+
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI API; needs OPENAI_API_KEY."""
+
+    name = "openai"
+    version = 1
+    min_score = 0.35
+    confident_score = 0.55
+
+    def __init__(self, dim=1536, model="text-embedding-3-small", batch_size=256):
+        from openai import OpenAI
+
+        self.dim = dim
+        self.model = model
+        self.batch_size = batch_size
+        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    def embed(self, texts):
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = [t or " " for t in texts[start:start + self.batch_size]]
+            response = self.client.embeddings.create(
+                model=self.model, input=batch, dimensions=self.dim
+            )
+            rows.extend(item.embedding for item in response.data)
+        return _normalize(np.asarray(rows, dtype=np.float32).reshape(-1, self.dim))
+
+
+PROVIDERS = {
+    HashingEmbedder.name: HashingEmbedder,
+    OpenAIEmbedder.name: OpenAIEmbedder,
+}
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorIndex:
+    """Append-only cosine-similarity index stored under `path`.
+
+    Each entry has a unique key (e.g. "Answer:<uuid>") used to skip rows that
+    were already indexed, and a Question uuid returned by `search`. The
+    provider's score thresholds are stored in meta.json alongside the vectors
+    and exposed as `min_score` / `confident_score`.
+    """
+
+    def __init__(self, path, provider=None):
+        self.path = path
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if provider is None:
+                provider = PROVIDERS[meta["provider"]](dim=meta["dim"])
+            built_with = (meta["provider"], meta["dim"], meta.get("version", 1))
+            if (provider.name, provider.dim, provider.version) != built_with:
+                raise ValueError(
+                    f"Index at {path} was built with {'/'.join(map(str, built_with))}, "
+                    f"not {provider.name}/{provider.dim}/{provider.version}; rebuild it"
+                )
+            with open(os.path.join(path, ENTRIES_FILE), encoding="utf-8") as f:
+                entries = json.load(f)
+        else:
+            provider = provider or HashingEmbedder()
+            entries = []
+            meta = {}
+        self.provider = provider
+        self.min_score = meta.get("min_score", provider.min_score)
+        self.confident_score = meta.get("confident_score", provider.confident_score)
+        self.keys = [key for key, _ in entries]
+        self.ids = [question_id for _, question_id in entries]
+        self._known = set(self.keys)
+        self._dirty = False
+        self._open_matrix()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _open_matrix(self):
+        vectors_path = os.path.join(self.path, VECTORS_FILE)
+        if not self.keys:
+            self._matrix = np.empty((0, self.provider.dim), dtype=np.float32)
+            return
+        # Rows past len(self.keys) belong to an interrupted append and are ignored.
+        self._matrix = np.memmap(
+            vectors_path, dtype=np.float32, mode="r",
+            shape=(len(self.keys), self.provider.dim),
+        )
+
+    def append(self, entries, save=True):
+        """Embed and add `(key, question_id, text)` entries; returns how many were new.
+
+        Vectors are appended to disk immediately, but with `save=False` the
+        entry list is only written by a later `save()`. Bulk loads use this to
+        avoid rewriting entries.json after every batch.
+        """
+        new, seen = [], set()
+        for key, question_id, text in entries:
+            if key not in self._known and key not in seen:
+                seen.add(key)
+                new.append((key, question_id, text))
+        if not new:
+            return 0
+
+        vectors = self.provider.embed([text for _, _, text in new])
+        os.makedirs(self.path, exist_ok=True)
+        vectors_path = os.path.join(self.path, VECTORS_FILE)
+        # Release the memmap before growing the file underneath it; search reopens it.
+        self._matrix = None
+        with open(vectors_path, "ab") as f:
+            f.truncate(len(self.keys) * self.provider.dim * 4)
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+
+        self.keys.extend(key for key, _, _ in new)
+        self.ids.extend(question_id for _, question_id, _ in new)
+        self._known |= seen
+        self._dirty = True
+        if save:
+            self.save()
+        return len(new)
+
+    def save(self):
+        """Write entries.json and meta.json if anything was appended since the last save."""
+        if not self._dirty:
+            return
+        self._write_json(ENTRIES_FILE, [[k, i] for k, i in zip(self.keys, self.ids)])
+        self._write_json(META_FILE, {
+            "provider": self.provider.name,
+            "dim": self.provider.dim,
+            "version": self.provider.version,
+            "min_score": self.min_score,
+            "confident_score": self.confident_score,
+        })
+        self._dirty = False
+
+    def _write_json(self, name, data):
+        target = os.path.join(self.path, name)
+        tmp = target + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, target)
+
+    def search(self, queries, k=10, min_score=None, chunk_size=65536):
+        """Return the top-k `(question_id, score)` pairs for each query.
+
+        Queries are embedded in one batch and scored against the matrix in
+        chunks, so memory stays at `len(queries) * chunk_size` floats. Hits
+        scoring below `min_score` are dropped, so a query may get fewer than k
+        (or no) hits. A single string returns a single list instead of a list
+        of lists.
+        """
+        single = isinstance(queries, str)
+        queries = [queries] if single else list(queries)
+        if not queries or not self.keys:
+            return [] if single else [[] for _ in queries]
+
+        if self._matrix is None:
+            self._open_matrix()
+        query_vectors = self.provider.embed(queries)
+        # Several entries can share a Question uuid, so over-fetch before de-duplicating.
+        fetch = min(len(self.keys), k * 4)
+        top_scores = np.empty((len(queries), 0), dtype=np.float32)
+        top_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self.keys), chunk_size):
+            block = np.asarray(self._matrix[start:start + chunk_size])
+            scores = np.concatenate([top_scores, query_vectors @ block.T], axis=1)
+            rows = np.concatenate(
+                [top_rows, np.broadcast_to(np.arange(start, start + len(block)), (len(queries), len(block)))],
+                axis=1,
+            )
+            if scores.shape[1] > fetch:
+                keep = np.argpartition(-scores, fetch - 1, axis=1)[:, :fetch]
+                scores = np.take_along_axis(scores, keep, axis=1)
+                rows = np.take_along_axis(rows, keep, axis=1)
+            top_scores, top_rows = scores, rows
+
+        order = np.argsort(-top_scores, axis=1)
+        results = []
+        for q in range(len(queries)):
+            hits, seen = [], set()
+            for j in order[q]:
+                if min_score is not None and top_scores[q, j] < min_score:
+                    break
+                question_id = self.ids[top_rows[q, j]]
+                if question_id in seen:
+                    continue
+                seen.add(question_id)
+                hits.append((question_id, float(top_scores[q, j])))
+                if len(hits) == k:
+                    break
+            results.append(hits)
+        return results[0] if single else results
+
+
+QUESTION_TITLES_QUERY = """
+MATCH (q:Question)
+WHERE q.uuid IS NOT NULL AND q.title IS NOT NULL
+RETURN 'Question:' + q.uuid AS key, q.uuid AS question_id, q.title AS text
+"""
+
+ANSWER_SNIPPETS_QUERY = """
+MATCH (a:Answer)-[:ANSWERED]->(q:Question)
+WHERE a.uuid IS NOT NULL AND a.body_markdown IS NOT NULL
+RETURN 'Answer:' + a.uuid AS key, q.uuid AS question_id, left(a.body_markdown, $snippet_length) AS text
+"""
+
+
+def sync_from_neo4j(index, driver, include_answers=False, snippet_length=500,
+                    batch_size=1000, database="neo4j"):
+    """Append every Question title (and Answer snippet) not yet in `index`."""
+    from neo4j import READ_ACCESS
+
+    queries = [QUESTION_TITLES_QUERY]
+    if include_answers:
+        queries.append(ANSWER_SNIPPETS_QUERY)
+
+    added = 0
+    try:
+        with driver.session(database=database, default_access_mode=READ_ACCESS) as session:
+            for query in queries:
+                batch = []
+                for record in session.run(query, snippet_length=snippet_length):
+                    batch.append((record["key"], record["question_id"], record["text"]))
+                    if len(batch) >= batch_size:
+                        added += index.append(batch, save=False)
+                        batch = []
+                added += index.append(batch, save=False)
+    finally:
+        # entries.json is written once per sync; rows embedded before a failure are kept.
+        index.save()
+    return added
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+    from neo4j import GraphDatabase
+
+    parser = argparse.ArgumentParser(description="Build or extend the local question vector index")
+    parser.add_argument("--path", default=os.getenv("VECTOR_INDEX_PATH", "vector_index"))
+    parser.add_argument("--provider", choices=sorted(PROVIDERS), default=None,
+                        help="embedding provider for a new index (default: hashing)")
+    parser.add_argument("--answers", action="store_true", help="also index answer snippets")
+    parser.add_argument("--database", default="neo4j")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    provider = PROVIDERS[args.provider]() if args.provider else None
+    index = VectorIndex(args.path, provider)
+    auth = (os.getenv("NEO4J_AUTH_USERNAME"), os.getenv("NEO4J_AUTH_PASSWORD"))
+    with GraphDatabase.driver(os.getenv("NEO4J_URI"), auth=auth) as driver:
+        driver.verify_connectivity()
+        added = sync_from_neo4j(index, driver, include_answers=args.answers, database=args.database)
+    print(f"Added {added} entries; index now holds {len(index)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ import os
 import openai
 from dotenv import load_dotenv
 import re
+from neo4j import GraphDatabase
+from schema_introspection import SchemaCache
 
 # 1. 환경 변수 불러오기
 load_dotenv()
@@ -80,6 +82,27 @@ Graph Schema for StackOverflow Neo4j:
   - (c:Comment)-[:COMMENTED_ON]->(a:Answer)
 """
 
+# 5-1. DB에서 스키마를 읽어와 캐시 (연결 실패 시 위의 정적 스키마 사용)
+NEO4J_URI = os.getenv("NEO4J_URI")
+NEO4J_AUTH = (os.getenv("NEO4J_AUTH_USERNAME"), os.getenv("NEO4J_AUTH_PASSWORD"))
+neo4j_driver = GraphDatabase.driver(NEO4J_URI, auth=NEO4J_AUTH) if NEO4J_URI else None
+schema_cache = SchemaCache(
+    neo4j_driver,
+    fallback=STACKOVERFLOW_SCHEMA,
+    ttl=int(os.getenv("SCHEMA_REFRESH_SECONDS", "86400")),
+)
+
+
+@app.on_event("startup")
+def load_schema():
+    schema_cache.refresh()
+
+
+@app.on_event("shutdown")
+def close_driver():
+    if neo4j_driver is not None:
+        neo4j_driver.close()
+
 
 # 6. 자연어 → Cypher 변환 함수
 def natural_language_to_cypher(nl_query: str) -> str:
@@ -116,7 +139,7 @@ Now, using the provided schema, translate the following question. Output ONLY th
 
     user_prompt = f"""
 Schema:
-{STACKOVERFLOW_SCHEMA}
+{schema_cache.get()}
 
 Natural language question:
 "{nl_query}"
@@ -0,0 +1,292 @@
+# provision_indexes.py
+#
+# Creates the indexes that generated Cypher queries rely on and verifies them.
+#
+#   python provision_indexes.py                       # baseline indexes only
+#   python provision_indexes.py --query-log query.log # + indexes the log needs
+#   python provision_indexes.py --dry-run             # print DDL, change nothing
+
+import argparse
+import json
+import os
+import re
+import sys
+
+from dotenv import load_dotenv
+from neo4j import GraphDatabase
+
+from schema_introspection import quote_name
+
+# (kind, label, property) — kind is one of "unique", "range", "text".
+BASELINE_INDEXES = [
+    ("unique", "Question", "uuid"),
+    ("unique", "Answer", "uuid"),
+    ("unique", "User", "uuid"),
+    ("unique", "Comment", "uuid"),
+    ("unique", "Tag", "name"),
+    ("range", "User", "display_name"),
+    ("range", "Question", "title"),
+    ("range", "Question", "creation_date"),
+    ("text", "Question", "title"),
+]
+
+# Properties holding free text; CONTAINS / ENDS WITH filters on these get a text index.
+TEXT_PROPERTIES = {"title", "body_markdown", "display_name"}
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NODE_VAR = re.compile(r"\(\s*(\w+)?\s*:\s*`?(\w+)`?\s*(\{[^}]*\})?")
+_INLINE_PROP = re.compile(r"[{,]\s*`?(\w+)`?\s*:")
+_WHERE_PROP = re.compile(r"\b(\w+)\.(\w+)\s*(=~|=|<>|<=|>=|<|>|IN\b|STARTS\s+WITH|ENDS\s+WITH|CONTAINS)", re.I)
+# Clause keywords; the lookbehinds keep "STARTS WITH" / "ENDS WITH" from splitting a WHERE clause.
+_CLAUSE = re.compile(
+    r"\b(OPTIONAL\s+MATCH|MATCH|MERGE|CREATE|WHERE|(?<!STARTS )(?<!ENDS )WITH|RETURN|SET|"
+    r"DETACH\s+DELETE|DELETE|REMOVE|UNWIND|CALL|ORDER\s+BY|SKIP|LIMIT|UNION|FOREACH)\b",
+    re.I,
+)
+# Clauses whose inline property maps act as lookups rather than writes.
+_LOOKUP_CLAUSES = {"MATCH", "OPTIONAL MATCH", "MERGE"}
+
+
+def _clauses(query):
+    """Split a query into (KEYWORD, body) pairs."""
+    matches = list(_CLAUSE.finditer(query))
+    return [
+        (" ".join(m.group(1).upper().split()), query[m.end():matches[i + 1].start() if i + 1 < len(matches) else len(query)])
+        for i, m in enumerate(matches)
+    ]
+
+
+def indexes_from_queries(queries):
+    """Derive (kind, label, property) index specs from the filters in `queries`.
+
+    Equality, range and prefix filters map to range indexes; CONTAINS and ENDS
+    WITH filters on free-text properties map to text indexes. Only WHERE
+    predicates and MATCH/MERGE property maps count; writes (SET, CREATE),
+    inequality (<>) and regex filters are skipped because no index serves them.
+    """
+    specs = set()
+    for query in queries:
+        # 문자열 리터럴 안의 "key:" 형태가 속성으로 잡히지 않도록 먼저 제거
+        query = _STRING_LITERAL.sub("''", query)
+        clauses = _clauses(query)
+        variables = {}
+        for keyword, body in clauses:
+            for var, label, inline in _NODE_VAR.findall(body):
+                if var:
+                    variables[var] = label
+                if inline and keyword in _LOOKUP_CLAUSES:
+                    for prop in _INLINE_PROP.findall(inline):
+                        specs.add(("range", label, prop))
+        predicates = "\n".join(body for keyword, body in clauses if keyword == "WHERE")
+        for var, prop, op in _WHERE_PROP.findall(predicates):
+            label = variables.get(var)
+            if label is None:
+                continue
+            op = " ".join(op.upper().split())
+            if op in ("=~", "<>"):
+                continue
+            if op in ("CONTAINS", "ENDS WITH") and prop in TEXT_PROPERTIES:
+                specs.add(("text", label, prop))
+            else:
+                specs.add(("range", label, prop))
+    return specs
+
+
+_LOG_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}")
+_QUERY_START = re.compile(r"\b(?:OPTIONAL\s+MATCH|MATCH|WITH|UNWIND|CALL|RETURN)\b", re.I)
+_QUERY_END = re.compile(r"\s-\s\{.*", re.S)
+
+
+def read_query_log(path):
+    """Return the Cypher statements in a Neo4j query.log.
+
+    Both log formats are supported: JSON (one object per line with a "query"
+    field) and the default text format, where an entry starts at a timestamp
+    line and a multi-line query continues on the following lines. Files with
+    no timestamps hold one query per line, or ";"-terminated statements that
+    may span lines when the file contains any ";".
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    queries = []
+    entries = []
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("{"):
+            try:
+                record = json.loads(stripped)
+            except ValueError:
+                record = None
+            if isinstance(record, dict):
+                if record.get("query"):
+                    queries.append(record["query"])
+                continue
+        if _LOG_TIMESTAMP.match(stripped) or not entries:
+            entries.append([line])
+        else:
+            entries[-1].append(line)
+
+    if any(_LOG_TIMESTAMP.match(entry[0].strip()) for entry in entries):
+        for entry in entries:
+            text = "\n".join(entry)
+            match = _QUERY_START.search(text)
+            if match:
+                # "<ts> INFO  <ms> ms: ... - <query> - {params} - runtime=..."
+                queries.append(_QUERY_END.sub("", text[match.start():]))
+    else:
+        text = "\n".join(line for entry in entries for line in entry)
+        for statement in re.split(r";" if ";" in text else r"\n", text):
+            if _QUERY_START.search(statement):
+                queries.append(statement.strip())
+    return queries
+
+
+def index_name(kind, label, prop):
+    return f"{kind}_{label}_{prop}".lower()
+
+
+def ddl_for(kind, label, prop):
+    name = index_name(kind, label, prop)
+    if kind == "unique":
+        return (
+            f"CREATE CONSTRAINT {name} IF NOT EXISTS "
+            f"FOR (n:{quote_name(label)}) REQUIRE n.{quote_name(prop)} IS UNIQUE"
+        )
+    if kind == "text":
+        return f"CREATE TEXT INDEX {name} IF NOT EXISTS FOR (n:{quote_name(label)}) ON (n.{quote_name(prop)})"
+    return f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{quote_name(label)}) ON (n.{quote_name(prop)})"
+
+
+def resolve_specs(specs):
+    """Drop range indexes already covered by a uniqueness constraint and sort."""
+    unique = {(label, prop) for kind, label, prop in specs if kind == "unique"}
+    return sorted(
+        (kind, label, prop)
+        for kind, label, prop in specs
+        if not (kind == "range" and (label, prop) in unique)
+    )
+
+
+def _plan_operators(summary):
+    """Return (operatorType, details) for every operator in an EXPLAIN plan."""
+    operators = []
+    stack = [summary.plan] if summary.plan else []
+    while stack:
+        plan = stack.pop()
+        details = plan.get("args", {}).get("Details", "")
+        operators.append((plan["operatorType"].split("@")[0], details))
+        stack.extend(plan.get("children", []))
+    return operators
+
+
+def _find_index(driver, kind, label, prop, database="neo4j"):
+    """Return (name, state) of an index matching the spec by schema, not by name.
+
+    CREATE ... IF NOT EXISTS is a no-op when an equivalent index already exists
+    under another name (e.g. one created by hand), so the name we generate may
+    not be the one in the database.
+    """
+    if kind == "unique":
+        records, _, _ = driver.execute_query(
+            "SHOW CONSTRAINTS YIELD type, entityType, labelsOrTypes, properties, ownedIndex "
+            "WHERE entityType = 'NODE' AND type IN ['UNIQUENESS', 'NODE_PROPERTY_UNIQUENESS'] "
+            "AND labelsOrTypes = [$label] AND properties = [$prop] "
+            "RETURN ownedIndex",
+            {"label": label, "prop": prop},
+            database_=database,
+        )
+        if not records:
+            return None, "MISSING"
+        records, _, _ = driver.execute_query(
+            "SHOW INDEXES YIELD name, state WHERE name = $name RETURN name, state",
+            {"name": records[0]["ownedIndex"]},
+            database_=database,
+        )
+    else:
+        records, _, _ = driver.execute_query(
+            "SHOW INDEXES YIELD name, type, entityType, labelsOrTypes, properties, state "
+            "WHERE entityType = 'NODE' AND type = $type "
+            "AND labelsOrTypes = [$label] AND properties = [$prop] "
+            "RETURN name, state ORDER BY state = 'ONLINE' DESC",
+            {"type": kind.upper(), "label": label, "prop": prop},
+            database_=database,
+        )
+    if not records:
+        return None, "MISSING"
+    return records[0]["name"], records[0]["state"]
+
+
+def verify(driver, kind, label, prop, database="neo4j"):
+    """Check that the index is online and that the planner picks it under EXPLAIN."""
+    name, state = _find_index(driver, kind, label, prop, database)
+    if state != "ONLINE":
+        return False, state
+
+    if kind == "text":
+        # A range index on the same property can also serve CONTAINS, so check the index type too.
+        predicate = f"n.{quote_name(prop)} CONTAINS 'a'"
+        used = lambda op, details: "ContainsScan" in op and "TEXT INDEX" in details
+    else:
+        predicate = f"n.{quote_name(prop)} = $value"
+        used = lambda op, details: "IndexSeek" in op
+    _, summary, _ = driver.execute_query(
+        f"EXPLAIN MATCH (n:{quote_name(label)}) WHERE {predicate} RETURN n",
+        {"value": ""},
+        database_=database,
+    )
+    operators = _plan_operators(summary)
+    hits = sorted({op for op, details in operators if used(op, details)})
+    if not hits:
+        return False, "planner did not use index: " + ", ".join(sorted({op for op, _ in operators}))
+    return True, f"{name}: " + ", ".join(hits)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Provision Neo4j indexes for the StackOverflow graph")
+    parser.add_argument("--query-log", action="append", default=[],
+                        help="Neo4j query.log (or one query per line / ';'-terminated) to mine for filtered properties")
+    parser.add_argument("--database", default="neo4j")
+    parser.add_argument("--dry-run", action="store_true", help="print the DDL without running it")
+    args = parser.parse_args(argv)
+
+    specs = set(BASELINE_INDEXES)
+    for path in args.query_log:
+        specs |= indexes_from_queries(read_query_log(path))
+    specs = resolve_specs(specs)
+
+    if args.dry_run:
+        for spec in specs:
+            print(ddl_for(*spec) + ";")
+        return 0
+
+    load_dotenv()
+    uri = os.getenv("NEO4J_URI")
+    auth = (os.getenv("NEO4J_AUTH_USERNAME"), os.getenv("NEO4J_AUTH_PASSWORD"))
+    if not uri:
+        print("[ERROR] NEO4J_URI is not set.", file=sys.stderr)
+        return 1
+
+    failed = set()
+    with GraphDatabase.driver(uri, auth=auth) as driver:
+        driver.verify_connectivity()
+        for spec in specs:
+            try:
+                driver.execute_query(ddl_for(*spec), database_=args.database)
+            except Exception as e:
+                # 중복 값이 있으면 uniqueness 제약 조건 생성이 실패함
+                print(f"[FAIL] {index_name(*spec)}: {e}")
+                failed.add(index_name(*spec))
+        driver.execute_query("CALL db.awaitIndexes(300)", database_=args.database)
+
+        for spec in specs:
+            ok, detail = verify(driver, *spec, database=args.database)
+            print(f"[{'OK' if ok else 'FAIL'}] {index_name(*spec)}: {detail}")
+            if not ok:
+                failed.add(index_name(*spec))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
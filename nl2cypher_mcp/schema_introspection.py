@@ -0,0 +1,213 @@
+# schema_introspection.py
+
+import threading
+import time
+
+from neo4j import RoutingControl
+
+# Properties the LLM filters on most often; they are listed first in the prompt.
+PREFERRED_PROPERTIES = ("uuid", "name", "display_name", "title")
+
+
+def _read(driver, query, parameters=None, database="neo4j"):
+    records, _, _ = driver.execute_query(
+        query,
+        parameters or {},
+        database_=database,
+        routing_=RoutingControl.READ,
+    )
+    return records
+
+
+def quote_name(name):
+    """Backtick-quote a label, relationship type or property key for Cypher."""
+    return "`" + name.replace("`", "``") + "`"
+
+
+def introspect_schema(driver, database="neo4j"):
+    """Read labels, relationship patterns, property keys, counts and indexes.
+
+    db.schema.nodeTypeProperties() samples the whole store and is the slow
+    part on the full StackOverflow dump; label and relationship counts come
+    from the count store. The one exception is a relationship type that
+    connects several label pairs (e.g. COMMENTED_ON to Question and Answer).
+    Its per-pattern count needs both end labels, which the count store
+    cannot answer, so it is computed with a relationship scan.
+    """
+    node_properties = {}
+    for record in _read(driver, "CALL db.schema.nodeTypeProperties()", database=database):
+        for label in record["nodeLabels"]:
+            props = node_properties.setdefault(label, [])
+            if record["propertyName"] and record["propertyName"] not in props:
+                props.append(record["propertyName"])
+
+    patterns = set()
+    for record in _read(driver, "CALL db.schema.visualization()", database=database):
+        for rel in record["relationships"]:
+            start, end = rel.start_node, rel.end_node
+            start_label = start.get("name") or next(iter(start.labels), None)
+            end_label = end.get("name") or next(iter(end.labels), None)
+            if start_label and end_label:
+                patterns.add((start_label, rel.type, end_label))
+
+    label_counts = {}
+    for label in sorted(set(node_properties) | {p[0] for p in patterns} | {p[2] for p in patterns}):
+        records = _read(driver, f"MATCH (n:{quote_name(label)}) RETURN count(n) AS c", database=database)
+        label_counts[label] = records[0]["c"]
+
+    def count(pattern):
+        return _read(driver, f"MATCH {pattern} RETURN count(r) AS c", database=database)[0]["c"]
+
+    relationships = []
+    for start, rel_type, end in sorted(patterns):
+        rel = f"[r:{quote_name(rel_type)}]"
+        shared_start = sum(1 for p in patterns if p[:2] == (start, rel_type)) > 1
+        shared_end = sum(1 for p in patterns if p[1:] == (rel_type, end)) > 1
+        if shared_start or shared_end:
+            out_count = in_count = count(f"(:{quote_name(start)})-{rel}->(:{quote_name(end)})")
+        else:
+            out_count = count(f"(:{quote_name(start)})-{rel}->()")
+            in_count = count(f"()-{rel}->(:{quote_name(end)})")
+        if not out_count or not in_count:
+            continue
+        relationships.append({
+            "start": start,
+            "type": rel_type,
+            "end": end,
+            "avg_out": out_count / label_counts[start] if label_counts.get(start) else 0.0,
+            "avg_in": in_count / label_counts[end] if label_counts.get(end) else 0.0,
+        })
+
+    # Full-text indexes are left out: the planner never uses them for WHERE predicates.
+    indexed = {}
+    for record in _read(
+        driver,
+        "SHOW INDEXES YIELD entityType, type, labelsOrTypes, properties, state "
+        "WHERE entityType = 'NODE' AND state = 'ONLINE' AND type IN ['RANGE', 'TEXT'] "
+        "RETURN type, labelsOrTypes, properties",
+        database=database,
+    ):
+        for label in record["labelsOrTypes"] or []:
+            for prop in record["properties"] or []:
+                indexed.setdefault((label, prop), set()).add(record["type"])
+
+    return {
+        "labels": {
+            label: {
+                "count": label_counts.get(label, 0),
+                "properties": sorted(
+                    props,
+                    key=lambda p: (p not in PREFERRED_PROPERTIES, p),
+                ),
+            }
+            for label, props in node_properties.items()
+        },
+        "relationships": relationships,
+        "indexed": indexed,
+    }
+
+
+def _variable(label):
+    return label[0].lower()
+
+
+def render_schema(schema):
+    """Render an introspected schema in the same layout as STACKOVERFLOW_SCHEMA.
+
+    Relationship lines carry the average fan-out in both directions so the LLM
+    can tell which hops explode (e.g. Tag<-TAGGED-Question) and add a LIMIT or
+    aggregate with WITH before expanding further.
+    """
+    lines = ["Graph Schema for StackOverflow Neo4j:", "", "🟦 Nodes:"]
+    for label in sorted(schema["labels"]):
+        info = schema["labels"][label]
+        lines.append(f"  - ({_variable(label)}:{label})  [{info['count']:,} nodes]")
+        lines.append("      Properties:")
+        for prop in info["properties"]:
+            types = schema["indexed"].get((label, prop), set())
+            suffix = ""
+            if "RANGE" in types:
+                suffix += "  (indexed: equality/range/STARTS WITH)"
+            if "TEXT" in types:
+                suffix += "  (text-indexed: CONTAINS/ENDS WITH)"
+            lines.append(f"        - {prop}{suffix}")
+        lines.append("")
+
+    lines.append("🟨 Relationships (introspected from the database; avg fan-out per node):")
+    for rel in schema["relationships"]:
+        start, end = rel["start"], rel["end"]
+        lines.append(
+            f"  - ({_variable(start)}:{start})-[:{rel['type']}]->({_variable(end)}:{end})"
+            f"  ~{rel['avg_out']:.1f} per {start}, ~{rel['avg_in']:.1f} per {end}"
+        )
+    lines.append("")
+    lines.append(
+        "Only use the relationship directions listed above. When a hop averages more "
+        "than 10 per node, aggregate with WITH or add a LIMIT before expanding further."
+    )
+    return "\n".join(lines) + "\n"
+
+
+class SchemaCache:
+    """Caches the rendered prompt schema and re-introspects it every `ttl` seconds.
+
+    The schema rarely changes and introspection is expensive on the full dump,
+    so the default `ttl` is one day.
+
+    Once the cache is stale, `get` starts one background refresh and keeps
+    serving the old schema until it finishes, so requests never wait on
+    introspection. If the database is unreachable the last good schema is kept;
+    before the first successful introspection `fallback` is returned instead.
+    """
+
+    def __init__(self, driver, fallback, ttl=86400, database="neo4j"):
+        self.driver = driver
+        self.fallback = fallback
+        self.ttl = ttl
+        self.database = database
+        self._schema = None
+        self._loaded_at = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Introspect the database now; returns True on success.
+
+        Only one refresh runs at a time; a call made while another is in
+        progress returns False immediately.
+        """
+        if self.driver is None:
+            return False
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        return self._run_refresh()
+
+    def _run_refresh(self):
+        # 호출 전에 self._refreshing 이 True 로 설정되어 있어야 함
+        try:
+            schema = render_schema(introspect_schema(self.driver, self.database))
+        except Exception as e:
+            print(f"[WARN] Schema introspection failed, keeping cached schema: {e}")
+            schema = None
+        with self._lock:
+            if schema is not None:
+                self._schema = schema
+            # 실패한 경우에도 ttl 동안은 재시도하지 않음
+            self._loaded_at = time.monotonic()
+            self._refreshing = False
+        return schema is not None
+
+    def get(self):
+        """Return the cached schema, starting a background refresh if it is stale."""
+        if self.driver is not None:
+            with self._lock:
+                stale = not self._refreshing and (
+                    self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl
+                )
+                if stale:
+                    self._refreshing = True
+            if stale:
+                threading.Thread(target=self._run_refresh, daemon=True).start()
+        return self._schema or self.fallback
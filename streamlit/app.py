@@ -9,7 +9,8 @@ from neo4j import GraphDatabase, RoutingControl
 import datetime
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'graph_utils')))
-from graph_utils import execute_neo4j_query, convert_neo4j_to_graph
+from graph_utils import execute_neo4j_query, convert_neo4j_to_graph, fetch_question_neighborhood
+from vector_index import VectorIndex
 def show_node_properties(props):
     """Display node properties with a stylized title when available."""
     title = props.get("title") or props.get("display_name") or props.get("name")
@@ -119,6 +120,30 @@ def display_network_in_chat(nodes, edges):
                     st.write(selected)
             except Exception:
                 st.write(selected)
+@st.cache_resource(max_entries=1)
+def _open_vector_index(path, mtime):
+    """Open the vector index; `mtime` is only part of the cache key"""
+    return VectorIndex(path)
+def load_vector_index(path):
+    """Open the local question vector index, reopening it after each nightly append"""
+    entries_path = os.path.join(path, "entries.json") if path else ""
+    if not os.path.exists(os.path.join(path or "", "meta.json")) or not os.path.exists(entries_path):
+        return None
+    return _open_vector_index(path, os.path.getmtime(entries_path))
+def find_similar_questions(user_message, k=2):
+    """Search the local vector index for questions similar to the user message.
+    Only the top `k` questions seed the graph, keeping the neighborhood small
+    enough (< 25 nodes) to be summarized. Returns (hits, confident_hits). The score thresholds are the ones stored with
+    the index for its embedding provider, unless VECTOR_MIN_SCORE or
+    VECTOR_CONFIDENT_SCORE override them; off-topic messages match nothing.
+    """
+    index = load_vector_index(os.getenv("VECTOR_INDEX_PATH", "vector_index"))
+    if index is None:
+        return [], []
+    min_score = float(os.getenv("VECTOR_MIN_SCORE", index.min_score))
+    confident_score = float(os.getenv("VECTOR_CONFIDENT_SCORE", index.confident_score))
+    hits = index.search(user_message, k=k, min_score=min_score)
+    return hits, [hit for hit in hits if hit[1] >= confident_score]
 def clean_messages_for_api(messages):
     """Clean messages to ensure they are JSON serializable for the API"""
     cleaned_messages = []
@@ -193,6 +218,8 @@ st.sidebar.markdown("""
 - `NEO4J_AUTH_USERNAME`: Neo4j username
 - `NEO4J_AUTH_PASSWORD`: Neo4j password
 - `MCP_SERVER_ENDPOINT`: MCP server endpoint
+- `VECTOR_INDEX_PATH`: Local question vector index (optional)
+- `VECTOR_MIN_SCORE` / `VECTOR_CONFIDENT_SCORE`: Override the index's vector match thresholds (optional)
 """)
 # Main content
 st.image("https://stackoverflow.design/assets/img/logos/so/logo-stackoverflow.png", width=200)
@@ -267,33 +294,52 @@ if prompt := st.chat_input("여기에 질문하세요"):
     if api_key and NEO4J_URI:
         try:
             with st.chat_message("assistant"):
-                # Step 1: Call MCP server to generate Cypher query
-                with st.spinner("🔍 Generating database query..."):
-                    cipher_query, query_params = call_mcp_server(prompt)
-                    query_results = None
-                    nodes = []
-                    edges = []
+                # Step 1: Search the local vector index; only call the MCP server
+                # (gpt-4o) when no similar question is a confident match
+                try:
+                    similar, confident = find_similar_questions(prompt)
+                except Exception as e:
+                    # 벡터 인덱스 오류 시 기존 Cypher 경로로 계속 진행
+                    st.warning(f"Vector search unavailable: {e}")
+                    similar, confident = [], []
+                cipher_query, query_params = "", {}
+                query_results = None
+                nodes = []
+                edges = []
+                if similar:
+                    st.info("🔎 Semantic matches: " + ", ".join(f"{score:.2f}" for _, score in similar))
+                if confident:
+                    st.info("Using similar questions directly; skipped query generation")
+                else:
+                    with st.spinner("🔍 Generating database query..."):
+                        cipher_query, query_params = call_mcp_server(prompt)
 
                     if cipher_query:
                         # 쿼리문을 화면에 표시
                         st.info(f"Generated query: `{cipher_query}`")
-
-                        # Step 2: Execute query on Neo4j
-                        with st.spinner("📊 Querying database..."):
-                            with GraphDatabase.driver(NEO4J_URI, auth=NEO4J_AUTH) as driver:
-                                driver.verify_connectivity()
-                                query_results = execute_neo4j_query(driver, cipher_query, query_params)
-
-                                if query_results:
-                                    st.success(f"Found {len(query_results)} results")
-                                    # Step 3: Convert results to graph visualization
-                                    nodes, edges = convert_neo4j_to_graph(query_results)
-                                    st.write(f"🧪 nodes: {len(nodes)}, edges: {len(edges)}")
-                                else:
-                                    st.warning("No results found for the query")
                     else:
                         st.warning("Could not generate a valid database query")
 
+                # Step 2: Execute query on Neo4j
+                with st.spinner("📊 Querying database..."):
+                    with GraphDatabase.driver(NEO4J_URI, auth=NEO4J_AUTH) as driver:
+                        driver.verify_connectivity()
+                        if confident:
+                            query_results = fetch_question_neighborhood(driver, [q for q, _ in confident], answer_limit=2)
+                        elif cipher_query:
+                            query_results = execute_neo4j_query(driver, cipher_query, query_params)
+                        # 정확히 일치하는 결과가 없으면 임계값을 넘은 유사 질문으로 대체
+                        if not query_results and similar:
+                            query_results = fetch_question_neighborhood(driver, [q for q, _ in similar], answer_limit=2)
+
+                        if query_results:
+                            st.success(f"Found {len(query_results)} results")
+                            # Step 3: Convert results to graph visualization
+                            nodes, edges = convert_neo4j_to_graph(query_results)
+                            st.write(f"🧪 nodes: {len(nodes)}, edges: {len(edges)}")
+                        else:
+                            st.warning("No results found for the query")
+
                 # --- [수정됨] 노드 개수에 따라 AI 요약 여부 결정 ---
                 # Step 4: Generate response (AI summary or placeholder text)
                 assistant_response = ""
@@ -0,0 +1,69 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'graph_utils')))
+from vector_index import HashingEmbedder, VectorIndex
+
+TITLES = [
+    "Improving performance of graph traversal in Neo4j",
+    "What is the difference between MERGE and CREATE",
+    "How to find the shortest path between two nodes in Cypher",
+    "Neo4j index not used for STARTS WITH query",
+    "Importing a large CSV file into Neo4j with LOAD CSV",
+    "How do I return relationship properties in Cypher",
+    "Graph database vs relational database for social network",
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = VectorIndex(str(tmp_path / "index"))
+    index.append([(f"Question:q{i}", f"q{i}", title) for i, title in enumerate(TITLES)])
+    return index
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("how do I speed up graph traversals", "q0"),
+    ("shortest path between nodes", "q2"),
+    ("import csv into neo4j", "q4"),
+])
+def test_on_topic_query_is_a_confident_match(index, query, expected):
+    hits = index.search(query, k=1, min_score=index.min_score)
+    assert hits and hits[0][0] == expected
+    assert hits[0][1] >= index.confident_score
+
+
+@pytest.mark.parametrize("query", [
+    "what's the weather in Seoul today",
+    "java",
+    "how to cook pasta",
+    "what is the capital of France",
+])
+def test_off_topic_query_matches_nothing(index, query):
+    assert index.search(query, k=3, min_score=index.min_score) == []
+
+
+def test_thresholds_and_entries_survive_reopen(index):
+    index.append([("Question:q0", "q0", "duplicate"), ("Answer:a1", "q0", "Use a label index")])
+    reopened = VectorIndex(index.path)
+    assert len(reopened) == len(TITLES) + 1
+    assert (reopened.min_score, reopened.confident_score) == (
+        HashingEmbedder.min_score, HashingEmbedder.confident_score)
+    # Two entries point at q0 but it is only returned once.
+    hits = reopened.search("graph traversal label index", k=3)
+    assert [q for q, _ in hits].count("q0") == 1
+
+
+def test_rejects_index_built_with_another_provider(index):
+    with pytest.raises(ValueError):
+        VectorIndex(index.path, HashingEmbedder(dim=256))
+
+
+def test_unsaved_append_is_searchable_and_persisted_by_save(index):
+    index.append([("Question:q7", "q7", "Cypher APOC periodic iterate batching")], save=False)
+    assert index.search("apoc periodic iterate", k=1)[0][0] == "q7"
+    assert len(VectorIndex(index.path)) == len(TITLES)
+    index.save()
+    assert len(VectorIndex(index.path)) == len(TITLES) + 1